@@ -9,15 +9,29 @@ Use at your own risk. Always test with --dry-run first and back up your data.
 """
 
 import os
+import errno
 import shutil
 import hashlib
+import heapq
 import json
 from pathlib import Path
 import argparse
-from datetime import datetime
+import threading
+import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import jinja2
 
+try:
+    from blake3 import blake3 as new_hasher
+except ImportError:  # blake3 not installed, fall back to MD5
+    new_hasher = hashlib.md5
+
+try:
+    import orjson
+except ImportError:  # orjson not installed, fall back to the json module
+    orjson = None
+
 # --------------------------
 # Configuration Section
 # --------------------------
@@ -36,6 +50,13 @@ FILE_CATEGORIES = {
 # Default category for unrecognized file types
 DEFAULT_CATEGORY = "Miscellaneous"
 
+# Reverse lookup from extension to category, built once from FILE_CATEGORIES
+_EXT_TO_CATEGORY = {
+    ext: category
+    for category, extensions in FILE_CATEGORIES.items()
+    for ext in extensions
+}
+
 # Path configuration (Note: Adjust these paths according to your system)
 # WARNING: Hardcoded path might need modification for different environments
 DOWNLOADS_PATH = Path.home() / "Downloads"
@@ -43,138 +64,201 @@ DOWNLOADS_PATH = Path.home() / "Downloads"
 # Path to the Organized folder
 ORGANIZED_PATH = DOWNLOADS_PATH / "Organized"
 
+# Number of leading bytes hashed before committing to a full-file hash
+PREFIX_HASH_SIZE = 4096
+
+# Read buffer size used when hashing whole files
+HASH_CHUNK_SIZE = 1 << 20
+
+# HTML report template
+REPORT_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Downloads Organization Report</title>
+    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 2rem; }
+        .chart-container { margin: 2rem 0; max-width: 800px; }
+        table { border-collapse: collapse; width: 100%; }
+        th, td { padding: 8px; text-align: left; border-bottom: 1px solid #ddd; }
+        tr:hover { background-color: #f5f5f5; }
+    </style>
+</head>
+<body>
+    <h1>Organization Report</h1>
+    
+    <div class="chart-container">
+        <h2>File Type Distribution</h2>
+        <canvas id="typeChart"></canvas>
+    </div>
+
+    <div class="chart-container">
+        <h2>File Type History</h2>
+        <canvas id="historyChart"></canvas>
+    </div>
+
+    <h2>Largest Files (Top 10)</h2>
+    <table>
+        <tr><th>File</th><th>Size (MB)</th><th>Type</th><th>Path</th></tr>
+        {% for file in largest_files %}
+        <tr>
+            <td>{{ file.name }}</td>
+            <td>{{ "%.2f"|format(file.size_mb) }}</td>
+            <td>{{ file.category }}</td>
+            <td>{{ file.new_path }}</td>
+        </tr>
+        {% endfor %}
+    </table>
+
+    <h2>Oldest Files (Top 10)</h2>
+    <table>
+        <tr><th>File</th><th>Last Modified</th><th>Type</th><th>Path</th></tr>
+        {% for file in oldest_files %}
+        <tr>
+            <td>{{ file.name }}</td>
+            <td>{{ file.modified[:10] }}</td>
+            <td>{{ file.category }}</td>
+            <td>{{ file.new_path }}</td>
+        </tr>
+        {% endfor %}
+    </table>
+
+    <script>
+        // Pie Chart
+        new Chart(document.getElementById('typeChart'), {
+            type: 'pie',
+            data: {
+                labels: {{ categories|tojson }},
+                datasets: [{
+                    data: {{ counts|tojson }},
+                    backgroundColor: [
+                        '#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0',
+                        '#9966FF', '#FF9F40', '#E7E9ED'
+                    ]
+                }]
+            }
+        });
+
+        // History Chart
+        const historyData = {{ file_history|tojson }};
+        new Chart(document.getElementById('historyChart'), {
+            type: 'line',
+            data: {
+                labels: historyData.dates,
+                datasets: Object.entries(historyData.types).map(([type, counts]) => ({
+                    label: type,
+                    data: counts,
+                    borderWidth: 2,
+                    fill: false
+                }))
+            },
+            options: {
+                responsive: true,
+                scales: { y: { beginAtZero: true } }
+            }
+        });
+    </script>
+</body>
+</html>
+"""
+
+# Template environment, created on first use by get_jinja_env()
+_JINJA_ENV = None
+
 # --------------------------
 # Core Functions
 # --------------------------
 
 # Function to get the category of a file based on its extension
 def get_file_category(file_extension):
-    for category, extensions in FILE_CATEGORIES.items():
-        if file_extension.lower() in extensions:
-            return category
-    return DEFAULT_CATEGORY
-
-# Function to get the hash of a file
-def get_file_hash(file_path):
-    hash_md5 = hashlib.md5()
+    # Most extensions are already lowercase, so avoid allocating a new string for them
+    if not file_extension.islower():
+        file_extension = file_extension.lower()
+    return _EXT_TO_CATEGORY.get(file_extension, DEFAULT_CATEGORY)
+
+# Function to get the hash of a file (or of its first max_bytes bytes)
+def get_file_hash(file_path, max_bytes=None):
+    hasher = new_hasher()
     with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
-    return hash_md5.hexdigest()
+        if max_bytes is not None:
+            hasher.update(f.read(max_bytes))
+        else:
+            # Ask the kernel for aggressive readahead so large reads are served
+            # from already-queued I/O (Linux and most other POSIX systems)
+            if hasattr(os, "posix_fadvise"):
+                try:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                except OSError:
+                    pass  # only a hint; some filesystems reject it
+            buf = bytearray(HASH_CHUNK_SIZE)
+            view = memoryview(buf)
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                hasher.update(view[:n])
+    return hasher.hexdigest()
+
+# Function to check whether two files have identical contents.
+# Compares sizes first, then a prefix hash, and only then the full hash.
+# Pass file_size/dest_size when the sizes are already known to skip stat() calls.
+def is_duplicate(file_path, dest_path, file_size=None, dest_size=None):
+    if file_size is None:
+        file_size = file_path.stat().st_size
+    if dest_size is None:
+        dest_size = dest_path.stat().st_size
+    if file_size != dest_size:
+        return False
+    if get_file_hash(file_path, PREFIX_HASH_SIZE) != get_file_hash(dest_path, PREFIX_HASH_SIZE):
+        return False
+    # Small files are fully covered by the prefix hash
+    if file_size <= PREFIX_HASH_SIZE:
+        return True
+    return get_file_hash(file_path) == get_file_hash(dest_path)
+
+# Function to move a file. A plain rename is a metadata-only operation;
+# shutil.move's copy + delete is only used across filesystems.
+def move_file(src, dst):
+    try:
+        os.rename(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(src, dst)
+
+# Function to get the template environment. Compiled templates are kept in
+# memory for the life of the process and as bytecode on disk, so later runs
+# skip parsing entirely. The disk cache is skipped if its folder is unusable.
+def get_jinja_env():
+    global _JINJA_ENV
+    if _JINJA_ENV is None:
+        try:
+            bytecode_cache = jinja2.FileSystemBytecodeCache()
+        except (OSError, RuntimeError):
+            bytecode_cache = None
+        _JINJA_ENV = jinja2.Environment(
+            loader=jinja2.DictLoader({"report.html": REPORT_TEMPLATE}),
+            autoescape=True,
+            auto_reload=False,
+            bytecode_cache=bytecode_cache,
+        )
+    return _JINJA_ENV
 
 # Function to generate an HTML report
 def generate_html_report(report_data, output_path):
-    template_str = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Downloads Organization Report</title>
-        <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-        <style>
-            body { font-family: Arial, sans-serif; margin: 2rem; }
-            .chart-container { margin: 2rem 0; max-width: 800px; }
-            table { border-collapse: collapse; width: 100%; }
-            th, td { padding: 8px; text-align: left; border-bottom: 1px solid #ddd; }
-            tr:hover { background-color: #f5f5f5; }
-        </style>
-    </head>
-    <body>
-        <h1>Organization Report</h1>
-        
-        <div class="chart-container">
-            <h2>File Type Distribution</h2>
-            <canvas id="typeChart"></canvas>
-        </div>
-
-        <div class="chart-container">
-            <h2>File Type History</h2>
-            <canvas id="historyChart"></canvas>
-        </div>
-
-        <h2>Largest Files (Top 10)</h2>
-        <table>
-            <tr><th>File</th><th>Size (MB)</th><th>Type</th><th>Path</th></tr>
-            {% for file in largest_files %}
-            <tr>
-                <td>{{ file.name }}</td>
-                <td>{{ "%.2f"|format(file.size_mb) }}</td>
-                <td>{{ file.category }}</td>
-                <td>{{ file.new_path }}</td>
-            </tr>
-            {% endfor %}
-        </table>
-
-        <h2>Oldest Files (Top 10)</h2>
-        <table>
-            <tr><th>File</th><th>Last Modified</th><th>Type</th><th>Path</th></tr>
-            {% for file in oldest_files %}
-            <tr>
-                <td>{{ file.name }}</td>
-                <td>{{ file.modified[:10] }}</td>
-                <td>{{ file.category }}</td>
-                <td>{{ file.new_path }}</td>
-            </tr>
-            {% endfor %}
-        </table>
-
-        <script>
-            // Pie Chart
-            new Chart(document.getElementById('typeChart'), {
-                type: 'pie',
-                data: {
-                    labels: {{ categories|tojson }},
-                    datasets: [{
-                        data: {{ counts|tojson }},
-                        backgroundColor: [
-                            '#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0',
-                            '#9966FF', '#FF9F40', '#E7E9ED'
-                        ]
-                    }]
-                }
-            });
-
-            // History Chart
-            const historyData = {{ file_history|tojson }};
-            new Chart(document.getElementById('historyChart'), {
-                type: 'line',
-                data: {
-                    labels: historyData.dates,
-                    datasets: Object.entries(historyData.types).map(([type, counts]) => ({
-                        label: type,
-                        data: counts,
-                        borderWidth: 2,
-                        fill: false
-                    }))
-                },
-                options: {
-                    responsive: true,
-                    scales: { y: { beginAtZero: true } }
-                }
-            });
-        </script>
-    </body>
-    </html>
-    """
-
     # Prepare chart data
     categories = list(report_data['category_stats'].keys())
     counts = list(report_data['category_stats'].values())
     
-    # Generate file type history
-    file_history = defaultdict(lambda: {'dates': set(), 'types': defaultdict(int)})
+    # Generate file type history (files per category per month)
+    dates = sorted({file['modified'][:7] for file in report_data['all_files']})
+    month_index = {month: i for i, month in enumerate(dates)}
+    type_data = {cat: [0] * len(dates) for cat in categories}
     for file in report_data['all_files']:
-        month = file['modified'][:7]
-        file_history['dates'].add(month)
-        file_history['types'][file['category']] += 1
-
-    dates = sorted(file_history['dates'])
-    type_data = defaultdict(list)
-    for date in dates:
-        for cat in categories:
-            type_data[cat].append(file_history['types'][cat].get(date, 0))
-
-    template = jinja2.Template(template_str)
-    html = template.render(
+        type_data[file['category']][month_index[file['modified'][:7]]] += 1
+
+    html = get_jinja_env().get_template("report.html").render(
         categories=categories,
         counts=counts,
         largest_files=report_data['largest_files'][:10],
@@ -191,71 +275,124 @@ def organize_files(organize_by_date=False, dry_run=False):
     all_files = []
     duplicates = 0
     total_size = 0
-    start_time = datetime.now()
+    start_time = time.localtime()
+    start_ns = time.perf_counter_ns()
 
     if not dry_run and not ORGANIZED_PATH.exists():
         ORGANIZED_PATH.mkdir()
 
-    for item in DOWNLOADS_PATH.iterdir():
-        if item.is_dir() or item == ORGANIZED_PATH:
-            continue
-
-        ext = item.suffix
-        category = get_file_category(ext)
-        modified_date = datetime.fromtimestamp(item.stat().st_mtime)
-        
-        if organize_by_date:
-            date_folder = modified_date.strftime("%Y-%m")
-            dest_folder = ORGANIZED_PATH / category / date_folder
-        else:
-            dest_folder = ORGANIZED_PATH / category
+    # First pass: work out where every file should go
+    planned = []
+    with os.scandir(DOWNLOADS_PATH) as entries:
+        for entry in entries:
+            if entry.is_dir() or entry.path == str(ORGANIZED_PATH):
+                continue
 
-        if not dry_run and not dest_folder.exists():
-            dest_folder.mkdir(parents=True)
+            st = entry.stat()
+            ext = os.path.splitext(entry.name)[1]
+            category = get_file_category(ext)
+            modified_time = time.localtime(st.st_mtime)
+            modified = time.strftime("%Y-%m-%dT%H:%M:%S", modified_time)
 
-        dest_path = dest_folder / item.name
-        if dest_path.exists():
-            file_hash = get_file_hash(item)
-            dest_hash = get_file_hash(dest_path)
-            
-            if file_hash == dest_hash:
-                duplicates += 1
-                if not dry_run:
-                    item.unlink()
-                continue
+            if organize_by_date:
+                date_folder = modified[:7]
+                dest_folder = ORGANIZED_PATH / category / date_folder
             else:
+                dest_folder = ORGANIZED_PATH / category
+
+            planned.append((entry, st, ext, category, modified, dest_folder))
+
+    # Second pass: check, rename and move files concurrently. Each task only
+    # touches shared state under the lock; results are aggregated below.
+    lock = threading.Lock()
+    created_dirs = set()
+    folder_names = {}  # casefolded name -> actual name for each destination folder, snapshotted on first use
+
+    def process_file(planned_file):
+        entry, st, ext, _, _, dest_folder = planned_file
+        item = Path(entry.path)
+
+        # Errors here only skip this file so the rest of the run and its report still complete
+        try:
+            with lock:
+                if not dry_run and dest_folder not in created_dirs:
+                    dest_folder.mkdir(parents=True, exist_ok=True)
+                    created_dirs.add(dest_folder)
+
+                if dest_folder not in folder_names:
+                    names = os.listdir(dest_folder) if dest_folder.exists() else []
+                    folder_names[dest_folder] = {name.casefold(): name for name in names}
+                taken = folder_names[dest_folder]
+                # Names are matched ignoring case, as macOS and Windows compare them
+                existing_name = taken.get(entry.name.casefold())
+
+            # Compare against the file already holding this name outside the lock
+            if existing_name is not None:
+                existing_path = dest_folder / existing_name
+                try:
+                    existing_size = existing_path.stat().st_size
+                except FileNotFoundError:
+                    existing_size = None  # reserved earlier in this run but not moved yet
+                if existing_size is not None and is_duplicate(item, existing_path, st.st_size, existing_size):
+                    if not dry_run:
+                        item.unlink()
+                    return "duplicate", None
+        except OSError as e:
+            print(f"Error processing {entry.name}: {str(e)}")
+            return "error", None
+
+        with lock:
+            dest_name = entry.name
+            if dest_name.casefold() in taken:
                 counter = 1
-                while dest_path.exists():
-                    dest_path = dest_folder / f"{item.stem}_{counter}{ext}"
+                while f"{item.stem}_{counter}{ext}".casefold() in taken:
                     counter += 1
-
-        file_info = {
-            'name': item.name,
-            'category': category,
-            'size_mb': round(item.stat().st_size / (1024 * 1024), 2),
-            'modified': modified_date.isoformat(),
-            'new_path': str(dest_path.relative_to(ORGANIZED_PATH))
-        }
-        all_files.append(file_info)
-
-        stats[category] += 1
-        total_size += item.stat().st_size
+                dest_name = f"{item.stem}_{counter}{ext}"
+            taken[dest_name.casefold()] = dest_name
+        dest_path = dest_folder / dest_name
 
         if not dry_run:
             try:
-                shutil.move(str(item), str(dest_path))
+                move_file(entry.path, dest_path)
             except Exception as e:
-                print(f"Error moving {item.name}: {str(e)}")
+                print(f"Error moving {entry.name}: {str(e)}")
+                with lock:
+                    del taken[dest_name.casefold()]
+                return "error", None
+        return "moved", dest_path
+
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(process_file, planned)
+
+        for (entry, st, _, category, modified, _), (status, dest_path) in zip(planned, results):
+            if status == "duplicate":
+                duplicates += 1
+                continue
+            if status == "error":
+                continue
+
+            file_info = {
+                'name': entry.name,
+                'category': category,
+                'size_mb': round(st.st_size / (1024 * 1024), 2),
+                'modified': modified,
+                'new_path': str(dest_path.relative_to(ORGANIZED_PATH))
+            }
+            all_files.append(file_info)
+
+            stats[category] += 1
+            total_size += st.st_size
 
     # Prepare report data
-    all_files_sorted = sorted(all_files, key=lambda x: x['modified'])
-    largest_files = sorted(all_files, key=lambda x: x['size_mb'], reverse=True)
+    largest_files = heapq.nlargest(10, all_files, key=lambda x: x['size_mb'])
+    oldest_files = heapq.nsmallest(10, all_files, key=lambda x: x['modified'])
 
     # Generate reports
     report_data = {
         'metadata': {
-            'timestamp': start_time.isoformat(),
-            'duration_seconds': round((datetime.now() - start_time).total_seconds(), 2),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S', start_time),
+            'duration_seconds': round((time.perf_counter_ns() - start_ns) / 1e9, 2),
             'source_folder': str(DOWNLOADS_PATH),
             'target_folder': str(ORGANIZED_PATH),
             'total_files_processed': sum(stats.values()),
@@ -265,18 +402,22 @@ def organize_files(organize_by_date=False, dry_run=False):
         'category_stats': dict(stats),
         'all_files': all_files,
         'largest_files': largest_files,
-        'oldest_files': all_files_sorted
+        'oldest_files': oldest_files
     }
 
     # Generate reports
     if not dry_run:
         # JSON report
-        json_report_path = ORGANIZED_PATH / f"report_{start_time.strftime('%Y%m%d_%H%M%S')}.json"
-        with open(json_report_path, 'w') as f:
-            json.dump(report_data, f, indent=2)
+        json_report_path = ORGANIZED_PATH / f"report_{time.strftime('%Y%m%d_%H%M%S', start_time)}.json"
+        if orjson is not None:
+            with open(json_report_path, 'wb') as f:
+                f.write(orjson.dumps(report_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(json_report_path, 'w') as f:
+                json.dump(report_data, f, indent=2)
         
         # HTML report
-        html_report_path = ORGANIZED_PATH / f"report_{start_time.strftime('%Y%m%d_%H%M%S')}.html"
+        html_report_path = ORGANIZED_PATH / f"report_{time.strftime('%Y%m%d_%H%M%S', start_time)}.html"
         generate_html_report(report_data, html_report_path)
 
     # Console output